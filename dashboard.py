@@ -1,22 +1,168 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import glob
 import os
-from collections import Counter
+from numba import njit
 from datetime import datetime, timedelta
 
+# Copy-on-Write lets filtered frames share data with the source until written to,
+# so no defensive .copy() calls are needed
+pd.options.mode.copy_on_write = True
+
+DONE_STATUSES = ["Done", "Closed"]
+# Only the columns the dashboard actually reads are loaded
+DATA_COLUMNS = ("title", "url", "assignees", "labels", "status", "created_at", "updated_at")
+# Opt-in Polars engine for the monthly trend and label counts (run with POLARS=1)
+USE_POLARS = os.environ.get("POLARS") == "1"
+if USE_POLARS:
+    import polars as pl
+
+
+NS_PER_DAY = 86_400_000_000_000
+# NaT viewed as int64; skipped by the kernels the way pandas skips missing dates
+NAT_NS = np.iinfo(np.int64).min
+
+
+# Per-row date arithmetic on the raw int64 nanosecond values, compiled once and
+# cached on disk; each kernel does subtract/divide/compare in a single pass.
+# Deliberately serial: Streamlit runs sessions in threads, and numba's default
+# workqueue threading layer aborts the process on concurrent parallel calls.
+@njit(cache=True)
+def age_buckets(updated_ns, now_ns, is_done, stale_out, recent_out):
+    for i in range(updated_ns.shape[0]):
+        if updated_ns[i] == NAT_NS:
+            stale_out[i] = False
+            recent_out[i] = False
+            continue
+        age = (now_ns - updated_ns[i]) // NS_PER_DAY
+        stale_out[i] = not is_done[i] and age > 30
+        recent_out[i] = is_done[i] and age <= 30
+
+
+@njit(cache=True)
+def mean_completion_days(created_ns, updated_ns):
+    total = 0
+    count = 0
+    for i in range(created_ns.shape[0]):
+        if created_ns[i] != NAT_NS and updated_ns[i] != NAT_NS:
+            total += (updated_ns[i] - created_ns[i]) // NS_PER_DAY
+            count += 1
+    return total / count if count else np.nan
+
+
+def as_ns(s):
+    return s.to_numpy(dtype="datetime64[ns]").view("i8")
+
+
+def combine_trend(created, closed):
+    # Each series only spans its own dates; asfreq fills every month in the
+    # combined range so both engines return the same shape
+    trend_df = pd.concat([created, closed], axis=1).sort_index().fillna(0).astype("int32")
+    return trend_df.asfreq("MS", fill_value=0).rename_axis("Month")
+
+
+def polars_trend(filtered_df):
+    pdf = pl.from_pandas(filtered_df[["created_at", "updated_at", "is_done"]])
+    created = (pdf.sort("created_at").group_by_dynamic("created_at", every="1mo")
+               .agg(pl.len().alias("Created")).to_pandas().set_index("created_at")["Created"])
+    closed = (pdf.filter(pl.col("is_done")).sort("updated_at").group_by_dynamic("updated_at", every="1mo")
+              .agg(pl.len().alias("Closed")).to_pandas().set_index("updated_at")["Closed"])
+    return combine_trend(created, closed)
+
+
+def polars_label_counts(filtered_df):
+    labels = (pl.from_pandas(filtered_df[["labels"]])
+              .select(pl.col("labels").fill_null("").str.split(",").explode().str.strip_chars())
+              .filter(pl.col("labels") != "")
+              .group_by("labels", maintain_order=True).len()
+              .sort("len", descending=True, maintain_order=True))
+    return pd.Series(labels["len"].to_numpy(), index=pd.Index(labels["labels"].to_list(), name="labels"), name="count")
+
+
+# Cached loaders: Streamlit reruns the whole script on every widget interaction,
+# so the data file and the heavier derived frames are memoized. The file's mtime
+# is part of the key so a freshly fetched export invalidates the cache.
+@st.cache_data(show_spinner=False)
+def load_data(path, mtime, cols=DATA_COLUMNS):
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, columns=list(cols), dtype_backend="pyarrow")
+    else:
+        df = pd.read_csv(path, usecols=list(cols), engine="pyarrow", dtype_backend="pyarrow",
+                         parse_dates=["created_at", "updated_at"])
+    # Normalize once to timezone-naive UTC so no later step has to convert again
+    df["created_at"] = pd.to_datetime(df["created_at"], utc=True).dt.tz_convert(None)
+    df["updated_at"] = pd.to_datetime(df["updated_at"], utc=True).dt.tz_convert(None)
+    # Low-cardinality column compared and grouped on throughout the app
+    df["status"] = df["status"].astype("category")
+    # Assignees split once into an Arrow list<string> column for the workload sections
+    df["assignees_list"] = df["assignees"].fillna("").str.strip().str.split(r"\s*,\s*", regex=True)
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def filter_data(path, mtime, start_date, end_date):
+    df = load_data(path, mtime)
+    mask = (df["created_at"].dt.date >= start_date) & (df["created_at"].dt.date <= end_date)
+    filtered_df = df[mask]
+    # Done/Closed flag, evaluated once per filter and reused by every section
+    filtered_df["is_done"] = filtered_df["status"].isin(DONE_STATUSES).to_numpy()
+    return filtered_df
+
+
+@st.cache_data(show_spinner=False)
+def compute_trend(path, mtime, start_date, end_date):
+    filtered_df = filter_data(path, mtime, start_date, end_date)
+    if USE_POLARS:
+        return polars_trend(filtered_df)
+    # Bucket on the native datetime64 keys; months with no activity come out as 0
+    created = filtered_df.set_index("created_at").resample("MS").size().rename("Created")
+    closed = filtered_df[filtered_df["is_done"]].set_index("updated_at").resample("MS").size().rename("Closed")
+    return combine_trend(created, closed)
+
+
+@st.cache_data(show_spinner=False)
+def compute_assignee_pivot(path, mtime, start_date, end_date):
+    filtered_df = filter_data(path, mtime, start_date, end_date)
+    # One row per (item, assignee) pair
+    tmp = filtered_df[["is_done", "assignees_list"]].explode("assignees_list").rename(columns={"assignees_list": "Assignee"})
+    tmp = tmp[tmp["Assignee"].notna() & (tmp["Assignee"] != "")]
+    if tmp.empty:
+        return None
+    tmp["Status"] = pd.Categorical(np.where(tmp["is_done"], "Closed", "Open"), categories=["Open", "Closed"])
+    pivot = tmp.groupby(["Assignee", "Status"], observed=True).size().unstack("Status", fill_value=0)
+    # Plain string columns (still Open, Closed): pyarrow can't round-trip a CategoricalIndex
+    pivot.columns = pivot.columns.astype(str)
+    return pivot.rename_axis(columns=None)
+
+
+@st.cache_data(show_spinner=False)
+def compute_label_counts(path, mtime, start_date, end_date):
+    filtered_df = filter_data(path, mtime, start_date, end_date)
+    if USE_POLARS:
+        label_counts = polars_label_counts(filtered_df)
+        return label_counts if not label_counts.empty else None
+    labels = filtered_df["labels"].fillna("").str.split(",").explode().str.strip()
+    labels = labels[labels.notna() & (labels != "")]
+    if labels.empty:
+        return None
+    return labels.value_counts()
+
+
 st.title("Money and Product Solutions Github Activity Dashboard")
 
-# Find the latest CSV file
-csv_files = sorted(glob.glob("shopify_project_10432_items_*.csv"), reverse=True)
+# Find the latest project export, preferring Parquet over legacy CSV
+data_files = (sorted(glob.glob("shopify_project_10432_items_*.parquet"), reverse=True)
+              or sorted(glob.glob("shopify_project_10432_items_*.csv"), reverse=True))
 
-if csv_files:
-    default_csv = csv_files[0]
-    st.info(f"Loaded data from: {default_csv}")
-    df = pd.read_csv(default_csv, parse_dates=["created_at", "updated_at"])
+if data_files:
+    data_path = data_files[0]
+    data_mtime = os.path.getmtime(data_path)
+    st.info(f"Loaded data from: {data_path}")
+    df = load_data(data_path, data_mtime)
 else:
     df = None
-    st.warning("No project CSV file found. Please upload one below.")
+    st.warning("No project data file found. Please upload one below.")
 
 # uploaded = st.file_uploader("Or upload a project CSV file", type=["csv"])
 if df is not None:
@@ -30,31 +176,27 @@ if df is not None:
         min_value=min_date,
         max_value=max_date
     )
-    mask = (df["created_at"].dt.date >= start_date) & (df["created_at"].dt.date <= end_date)
-    filtered_df = df[mask].copy()
-    # Ensure both created_at and updated_at are timezone-naive
-    filtered_df["created_at"] = pd.to_datetime(filtered_df["created_at"]).dt.tz_localize(None)
-    filtered_df["updated_at"] = pd.to_datetime(filtered_df["updated_at"]).dt.tz_localize(None)
+    filtered_df = filter_data(data_path, data_mtime, start_date, end_date)
+    now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    is_done = filtered_df["is_done"].to_numpy()
+    # Stale / recently-closed masks, both bucketed on days since last update
+    stale_mask = np.empty(len(filtered_df), dtype=np.bool_)
+    recent_closed_mask = np.empty(len(filtered_df), dtype=np.bool_)
+    age_buckets(as_ns(filtered_df["updated_at"]), now.value, is_done, stale_mask, recent_closed_mask)
 
     st.markdown(f"**Showing {len(filtered_df)} items created between {start_date} and {end_date}.**")
 
     # --- 1. Project/Issue Completion Rate ---
     st.subheader("Completion Rate")
-    done_statuses = ["Done", "Closed"]
     total_items = len(filtered_df)
-    completed_items = filtered_df[filtered_df["status"].isin(done_statuses)]
-    # Ensure both created_at and updated_at are timezone-naive for completed_items as well
-    completed_items.loc[:, "created_at"] = pd.to_datetime(completed_items["created_at"]).dt.tz_localize(None)
-    completed_items.loc[:, "updated_at"] = pd.to_datetime(completed_items["updated_at"]).dt.tz_localize(None)
+    completed_items = filtered_df[is_done]
     completion_rate = len(completed_items) / total_items * 100 if total_items > 0 else 0
     st.metric("Completion Rate (%)", f"{completion_rate:.1f}")
 
     # --- 2. Average Time to Completion ---
     st.subheader("Average Time to Completion (Done/Closed)")
     if not completed_items.empty:
-        completed_items = completed_items.copy()
-        completed_items["completion_days"] = (completed_items["updated_at"] - completed_items["created_at"]).dt.days
-        avg_completion = completed_items["completion_days"].mean()
+        avg_completion = mean_completion_days(as_ns(completed_items["created_at"]), as_ns(completed_items["updated_at"]))
         st.metric("Average Days to Completion", f"{avg_completion:.1f}")
     else:
         st.info("No completed items in the selected date range.")
@@ -62,33 +204,16 @@ if df is not None:
     # --- 3. Items Created vs. Closed Over Time ---
     st.header("Trends")
     st.subheader("Items Created vs. Closed Over Time (per Month)")
-    filtered_df["created_month"] = filtered_df["created_at"].dt.to_period("M").astype(str)
-    created_per_month = filtered_df["created_month"].value_counts().sort_index()
-    closed_df = filtered_df[filtered_df["status"].isin(done_statuses)].copy()
-    closed_df["closed_month"] = closed_df["updated_at"].dt.to_period("M").astype(str)
-    closed_per_month = closed_df["closed_month"].value_counts().sort_index()
-    trend_df = pd.DataFrame({
-        "Created": created_per_month,
-        "Closed": closed_per_month
-    }).fillna(0)
+    trend_df = compute_trend(data_path, data_mtime, start_date, end_date)
     st.line_chart(trend_df)
-    st.dataframe(trend_df.reset_index().rename(columns={"index": "Month"}))
+    st.dataframe(trend_df.reset_index())
 
     # --- 4. Open vs. Closed by Assignee ---
     st.header("Workload Distribution")
     st.subheader("Open vs. Closed Items by Assignee")
-    open_df = filtered_df[~filtered_df["status"].isin(done_statuses)]
-    assignee_status = []
-    for _, row in filtered_df.iterrows():
-        assignees = [a.strip() for a in str(row["assignees"]).split(",") if a.strip()]
-        for a in assignees:
-            assignee_status.append({
-                "Assignee": a,
-                "Status": "Closed" if row["status"] in done_statuses else "Open"
-            })
-    if assignee_status:
-        assignee_status_df = pd.DataFrame(assignee_status)
-        pivot = pd.pivot_table(assignee_status_df, index="Assignee", columns="Status", aggfunc=len, fill_value=0)
+    open_df = filtered_df[~is_done]
+    pivot = compute_assignee_pivot(data_path, data_mtime, start_date, end_date)
+    if pivot is not None:
         st.dataframe(pivot)
         st.bar_chart(pivot)
     else:
@@ -96,11 +221,8 @@ if df is not None:
 
     # --- 5. Most Common Labels ---
     st.subheader("Most Common Labels")
-    all_labels = []
-    for labels in filtered_df["labels"].fillna(""):
-        all_labels.extend([l.strip() for l in str(labels).split(",") if l.strip()])
-    if all_labels:
-        label_counts = pd.Series(Counter(all_labels)).sort_values(ascending=False)
+    label_counts = compute_label_counts(data_path, data_mtime, start_date, end_date)
+    if label_counts is not None:
         st.bar_chart(label_counts.head(10))
         st.dataframe(label_counts.rename_axis('Label').reset_index(name='Count'))
     else:
@@ -119,8 +241,7 @@ if df is not None:
 
     # --- 7. Stale Items (not updated in 30+ days, still open) ---
     st.subheader("Stale Items (Open, Not Updated in 30+ Days)")
-    now = pd.Timestamp.now().replace(tzinfo=None)
-    stale = filtered_df[(~filtered_df["status"].isin(done_statuses)) & ((now - filtered_df["updated_at"]).dt.days > 30)]
+    stale = filtered_df[stale_mask]
     if not stale.empty:
         st.dataframe(stale[['title', 'status', 'url', 'updated_at']])
     else:
@@ -128,7 +249,7 @@ if df is not None:
 
     # --- 8. Recently Closed Items (last 30 days) ---
     st.subheader("Recently Closed Items (Last 30 Days)")
-    recently_closed = completed_items[(now - completed_items["updated_at"]).dt.days <= 30]
+    recently_closed = filtered_df[recent_closed_mask]
     if not recently_closed.empty:
         st.dataframe(recently_closed[['title', 'status', 'url', 'updated_at']])
     else:
@@ -136,7 +257,7 @@ if df is not None:
 
     # --- 9. Items With Multiple Assignees ---
     st.subheader("Items With Multiple Assignees")
-    multi_assignees = filtered_df[filtered_df["assignees"].apply(lambda x: len([a for a in str(x).split(",") if a.strip()]) > 1)]
+    multi_assignees = filtered_df[filtered_df["assignees_list"].list.len() > 1]
     if not multi_assignees.empty:
         st.dataframe(multi_assignees[['title', 'status', 'url', 'assignees']])
     else:
@@ -1,5 +1,8 @@
 import os
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import pandas as pd
 from datetime import datetime
 
@@ -14,6 +17,14 @@ if not GITHUB_TOKEN:
 API_URL = "https://api.github.com/graphql"
 HEADERS = {"Authorization": f"Bearer {GITHUB_TOKEN}"}
 
+# GraphQL pagination is cursor-based and has to stay sequential, so reuse one
+# connection for every page instead of renegotiating TLS on each request, and
+# retry transient 5xx and rate-limit responses with exponential backoff.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET", "POST"])))
+
 # GraphQL query to get project ID from project number
 GET_PROJECT_ID_QUERY = '''
 query($org: String!, $number: Int!) {
@@ -84,17 +95,20 @@ query($projectId: ID!, $cursor: String) {
 '''
 
 def run_query(query, variables):
-    response = requests.post(API_URL, json={"query": query, "variables": variables}, headers=HEADERS)
+    response = SESSION.post(API_URL, json={"query": query, "variables": variables})
     if response.status_code != 200:
         raise Exception(f"Query failed: {response.status_code} {response.text}")
-    return response.json()
+    return orjson.loads(response.content)
 
 def get_project_id(org, number):
     data = run_query(GET_PROJECT_ID_QUERY, {"org": org, "number": number})
     return data["data"]["organization"]["projectV2"]["id"]
 
+ITEM_COLUMNS = ("title", "number", "url", "assignees", "labels", "status", "created_at", "updated_at")
+
 def get_all_project_items(project_id):
-    items = []
+    # Collect column-wise so the DataFrame can be built without a row-to-column transpose
+    items = {col: [] for col in ITEM_COLUMNS}
     cursor = None
     while True:
         variables = {"projectId": project_id, "cursor": cursor}
@@ -114,16 +128,14 @@ def get_all_project_items(project_id):
             for fv in node["fieldValues"]["nodes"]:
                 if fv and fv.get("field", {}).get("name", "").lower() == "status":
                     status = fv.get("name")
-            items.append({
-                "title": title,
-                "number": number,
-                "url": url,
-                "assignees": assignees,
-                "labels": labels,
-                "status": status,
-                "created_at": created_at,
-                "updated_at": updated_at
-            })
+            items["title"].append(title)
+            items["number"].append(number)
+            items["url"].append(url)
+            items["assignees"].append(assignees)
+            items["labels"].append(labels)
+            items["status"].append(status)
+            items["created_at"].append(created_at)
+            items["updated_at"].append(updated_at)
         page_info = data["data"]["node"]["items"]["pageInfo"]
         if not page_info["hasNextPage"]:
             break
@@ -136,11 +148,14 @@ def main():
     print(f"Project ID: {project_id}")
     print("Fetching project items...")
     items = get_all_project_items(project_id)
-    print(f"Fetched {len(items)} items.")
+    print(f"Fetched {len(items['title'])} items.")
     df = pd.DataFrame(items)
+    # Store real timestamps so readers don't have to re-parse ISO strings
+    df["created_at"] = pd.to_datetime(df["created_at"], utc=True)
+    df["updated_at"] = pd.to_datetime(df["updated_at"], utc=True)
     today = datetime.now().strftime("%Y-%m-%d")
-    outname = f"shopify_project_{PROJECT_NUMBER}_items_{today}.csv"
-    df.to_csv(outname, index=False)
+    outname = f"shopify_project_{PROJECT_NUMBER}_items_{today}.parquet"
+    df.to_parquet(outname, index=False, compression="zstd")
     print(f"Saved data to {outname}")
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 import datetime
-import os
+import sqlite3
+from contextlib import closing
 
 st.title("GitHub Repo Revamp — Team Feedback Survey")
 st.write("Please rate how useful you think each of the following suggestions would be for our team's GitHub repo and workflow. 1 = Not useful at all, 5 = Amazingly useful.")
@@ -46,9 +47,8 @@ if submitted:
         "comments": comments
     }
     df = pd.DataFrame([data])
-    file_exists = os.path.isfile("survey_responses.csv")
-    if file_exists:
-        df.to_csv("survey_responses.csv", mode="a", header=False, index=False)
-    else:
-        df.to_csv("survey_responses.csv", mode="w", header=True, index=False)
+    # Append as a single INSERT; the table is created on the first submission.
+    # closing() releases the connection; the inner with commits the transaction.
+    with closing(sqlite3.connect("survey_responses.db")) as con, con:
+        df.to_sql("responses", con, if_exists="append", index=False)
     st.success("Thank you for your feedback! Your response has been recorded.") 
\ No newline at end of file
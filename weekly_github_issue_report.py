@@ -1,11 +1,21 @@
+import asyncio
+import duckdb
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import matplotlib
+matplotlib.use("Agg")  # headless: no GUI backend needed just to write PNGs
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
 import getpass
 import os
-from collections import Counter
+from urllib.parse import parse_qs, urlparse
 
 # --- CONFIGURATION ---
 REPO = "Shopify/Money-and-Product-Solutions"
@@ -16,24 +26,60 @@ if not GITHUB_TOKEN:
     GITHUB_TOKEN = getpass.getpass()
 
 HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"}
+
+# Retry policy shared by the sync session and the async page fetches:
+# transient 5xx and rate-limit responses are retried with exponential backoff.
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 1
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# Keep-alive session for synchronous requests
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, status_forcelist=RETRY_STATUSES, allowed_methods=["GET"])))
 PER_PAGE = 100
+MAX_CONCURRENT_REQUESTS = 10
+
+async def get_page(client, semaphore, url, params):
+    # HTTP/2 multiplexes every request over one connection, so the semaphore
+    # (not the connection pool) is what caps how many are in flight at once
+    async with semaphore:
+        for attempt in range(MAX_RETRIES + 1):
+            resp = await client.get(url, params=params)
+            if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return resp
+            # Honour GitHub's Retry-After on rate limits, otherwise back off exponentially
+            await asyncio.sleep(float(resp.headers.get("Retry-After", BACKOFF_FACTOR * 2 ** attempt)))
+
+async def fetch_pages(url, params, pages):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with httpx.AsyncClient(http2=True, headers=HEADERS) as client:
+        resps = await asyncio.gather(*[get_page(client, semaphore, url, {**params, "page": p}) for p in pages])
+    return [r.json() for r in resps]
 
 def fetch_issues(repo, state="all"):
     print("Fetching issues from GitHub...")
+    url = f"https://api.github.com/repos/{repo}/issues"
+    params = {"state": state, "per_page": PER_PAGE}
+    # The first page's Link header tells us the last page number, so the
+    # remaining pages can be requested concurrently instead of one by one.
+    resp = SESSION.get(url, params={**params, "page": 1})
+    pages = [resp.json()]
+    last = resp.links.get("last")
+    if last:
+        last_page = int(parse_qs(urlparse(last["url"]).query)["page"][0])
+        pages.extend(asyncio.run(fetch_pages(url, params, range(2, last_page + 1))))
     issues = []
-    page = 1
-    while True:
-        url = f"https://api.github.com/repos/{repo}/issues"
-        params = {"state": state, "per_page": PER_PAGE, "page": page}
-        resp = requests.get(url, headers=HEADERS, params=params)
-        data = resp.json()
-        if not data or 'message' in data:
+    for data in pages:
+        if not data:
             break
+        # An error body (e.g. a rate limit that outlasted the retries) would
+        # otherwise silently truncate the report
+        if 'message' in data:
+            raise Exception(f"Fetching issues failed: {data['message']}")
         # Exclude pull requests
         issues.extend([i for i in data if "pull_request" not in i])
-        if len(data) < PER_PAGE:
-            break
-        page += 1
     print(f"Fetched {len(issues)} issues.")
     return issues
 
@@ -54,16 +100,59 @@ def process_issues(issues):
         return df
     df["created_at"] = pd.to_datetime(df["created_at"]).dt.tz_localize(None)
     df["closed_at"] = pd.to_datetime(df["closed_at"]).dt.tz_localize(None)
+    # Keep labels as a typed list column so they survive the Parquet round trip
+    df["labels"] = df["labels"].astype(pd.ArrowDtype(pa.list_(pa.string())))
     return df
 
 def save_report(df):
     today = datetime.now().strftime("%Y-%m-%d")
-    report_name = f"issue_report_{today}.csv"
-    df.to_csv(report_name, index=False)
+    report_name = f"issue_report_{today}.parquet"
+    df.to_parquet(report_name, index=False, compression="zstd")
     print(f"Saved raw issue data to {report_name}")
+    return report_name
+
+def has_label(labels, *names):
+    # labels is an Arrow list<string> column; match against the flattened values
+    # and map hits back to their parent rows instead of testing each list in Python.
+    arr = pa.array(labels.array)
+    hits = pc.filter(pc.list_parent_indices(arr), pc.is_in(pc.list_flatten(arr), value_set=pa.array(names)))
+    mask = np.zeros(len(labels), dtype=bool)
+    mask[hits.to_numpy()] = True
+    return pd.Series(mask, index=labels.index)
+
+def count_labels(labels):
+    # Flatten and count inside Arrow rather than building a Python list of every label
+    counts = pc.value_counts(pc.list_flatten(pa.array(labels.array)))
+    return pd.Series(counts.field("counts").to_numpy(), index=counts.field("values").to_pandas(),
+                     name="count").sort_values(ascending=False, kind="stable")
+
+# Every scalar statistic in the report, computed in a single scan of the saved Parquet file
+SUMMARY_QUERY = """
+SELECT
+    count(*) AS total,
+    count(*) FILTER (WHERE state = 'open') AS open,
+    count(*) FILTER (WHERE state = 'closed') AS closed,
+    count(*) FILTER (WHERE len(labels) = 0) AS no_label,
+    count(*) FILTER (WHERE assignee IS NULL) AS no_assignee,
+    avg(CASE WHEN len(labels) > 0 THEN 1 ELSE 0 END) AS label_coverage,
+    avg(resolution_days) FILTER (WHERE state = 'closed') AS avg_days_to_close,
+    median(resolution_days) FILTER (WHERE state = 'closed') AS median_days_to_close
+FROM (SELECT *, floor(epoch(closed_at - created_at) / 86400) AS resolution_days FROM issues)
+"""
+
+def open_report(report_name):
+    con = duckdb.connect()
+    con.read_parquet(report_name).create_view("issues")
+    return con
+
+def monthly_counts(con, col):
+    counts = con.execute(f"SELECT date_trunc('month', {col}) AS month, count(*) AS n FROM issues "
+                         f"WHERE {col} IS NOT NULL GROUP BY month ORDER BY month").df()
+    return counts.set_index("month")["n"].asfreq("MS", fill_value=0)
 
 def plot_and_save(fig, name):
     fig.savefig(name, bbox_inches='tight')
+    plt.close(fig)
     print(f"Saved plot: {name}")
 
 def main():
@@ -72,41 +161,38 @@ def main():
     if df.empty:
         return
 
-    save_report(df)
+    report_name = save_report(df)
+    now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    con = open_report(report_name)
+    stats = con.execute(SUMMARY_QUERY).df().to_dict("records")[0]
 
     # --- 1. Issue statistics ---
     print("\n--- Issue Statistics ---")
-    print("Total issues:", len(df))
-    print("Open issues:", (df["state"] == "open").sum())
-    print("Closed issues:", (df["state"] == "closed").sum())
-    print("Issues with no labels:", (df["labels"].apply(len) == 0).sum())
-    print("Issues with no assignee:", df["assignee"].isna().sum())
+    print("Total issues:", stats["total"])
+    print("Open issues:", stats["open"])
+    print("Closed issues:", stats["closed"])
+    print("Issues with no labels:", stats["no_label"])
+    print("Issues with no assignee:", stats["no_assignee"])
 
     # --- 2. Trends ---
     print("\n--- Trends ---")
-    all_labels = [label for labels in df["labels"] for label in labels]
-    label_counts = pd.Series(all_labels).value_counts()
+    label_counts = count_labels(df["labels"])
     print("Top 5 labels:\n", label_counts.head(5))
     print("Top 5 assignees:\n", df["assignee"].value_counts().head(5))
     print("Top 5 creators:\n", df["user"].value_counts().head(5))
 
     # --- 3. Activity over time ---
     print("\n--- Activity Over Time ---")
-    df.set_index("created_at", inplace=True)
-    created_per_month = df.resample("M").size()
+    created_per_month = monthly_counts(con, "created_at")
     fig1, ax1 = plt.subplots()
     created_per_month.plot(ax=ax1, title="Issues Created per Month")
     plot_and_save(fig1, "issues_created_per_month.png")
-    df.reset_index(inplace=True)
 
-    if df["closed_at"].notna().any():
-        df_closed = df.dropna(subset=["closed_at"]).copy()
-        df_closed.set_index("closed_at", inplace=True)
-        closed_per_month = df_closed.resample("M").size()
+    if stats["closed"]:
+        closed_per_month = monthly_counts(con, "closed_at")
         fig2, ax2 = plt.subplots()
         closed_per_month.plot(ax=ax2, color="green", title="Issues Closed per Month")
         plot_and_save(fig2, "issues_closed_per_month.png")
-        df_closed.reset_index(inplace=True)
 
     # --- 4. Contributor analysis ---
     print("\n--- Contributor Analysis ---")
@@ -117,20 +203,20 @@ def main():
     print("\n--- Issue Resolution Time ---")
     df["resolution_time"] = (df["closed_at"] - df["created_at"]).dt.days
     closed_issues = df[df["state"] == "closed"]
-    print("Average days to close:", closed_issues["resolution_time"].mean())
-    print("Median days to close:", closed_issues["resolution_time"].median())
+    print("Average days to close:", stats["avg_days_to_close"])
+    print("Median days to close:", stats["median_days_to_close"])
     print("Longest to close:\n", closed_issues.nlargest(3, "resolution_time")[["number", "title", "resolution_time"]])
     print("Quickest to close:\n", closed_issues.nsmallest(3, "resolution_time")[["number", "title", "resolution_time"]])
 
     # --- 6. Untriaged/unassigned issues ---
     print("\n--- Untriaged/Unassigned Issues ---")
-    print("Issues with no labels:", df[df["labels"].apply(len) == 0][["number", "title"]])
+    print("Issues with no labels:", df[df["labels"].list.len() == 0][["number", "title"]])
     print("Issues with no assignee:", df[df["assignee"].isna()][["number", "title"]])
 
     # --- 7. Bug vs. feature requests ---
     print("\n--- Bug vs. Feature Requests ---")
-    print("Bug issues:", df[df["labels"].apply(lambda x: "bug" in x)][["number", "title"]])
-    print("Feature requests:", df[df["labels"].apply(lambda x: "feature" in x or "enhancement" in x)][["number", "title"]])
+    print("Bug issues:", df[has_label(df["labels"], "bug")][["number", "title"]])
+    print("Feature requests:", df[has_label(df["labels"], "feature", "enhancement")][["number", "title"]])
 
     # --- 8. Reopened issues ---
     # GitHub API v3 does not directly provide "reopened" status, so we skip this for now.
@@ -141,7 +227,6 @@ def main():
 
     # --- 10. Stale issues ---
     print("\n--- Stale Issues (open > 90 days) ---")
-    now = pd.Timestamp.now().tz_localize(None)
     stale = df[(df["state"] == "open") & ((now - df["created_at"]).dt.days > 90)]
     print(stale[["number", "title", "created_at"]])
 
@@ -151,12 +236,14 @@ def main():
 
     # --- 12. Label coverage ---
     print("\n--- Label Coverage ---")
-    print("Percentage of issues with labels:", 100 * (df["labels"].apply(len) > 0).mean())
+    print("Percentage of issues with labels:", 100 * stats["label_coverage"])
+    con.close()
 
-    print("\nAnalysis complete! See CSV and PNG files in this folder.")
+    print("\nAnalysis complete! See Parquet and PNG files in this folder.")
 
-    # Load your CSV
-    df = pd.read_csv('issue_report_2025-05-20.csv', parse_dates=['created_at', 'closed_at'])
+    # Load the saved report; labels come back as a list<string> column
+    df = pd.read_parquet(report_name, dtype_backend='pyarrow',
+                         columns=['state', 'labels', 'assignee', 'user', 'created_at', 'closed_at'])
 
     # Filter for 2025 issues
     df_2025 = df[df['created_at'].dt.year == 2025]
@@ -165,7 +252,7 @@ def main():
     total_2025 = len(df_2025)
     open_2025 = (df_2025['state'] == 'open').sum()
     closed_2025 = (df_2025['state'] == 'closed').sum()
-    nolabel_2025 = (df_2025['labels'].apply(lambda x: len(eval(x)) == 0)).sum()
+    nolabel_2025 = (df_2025['labels'].list.len() == 0).sum()
     nolabel_pct = round(100 * nolabel_2025 / total_2025, 1) if total_2025 else 0
 
     # Top contributors
@@ -173,8 +260,7 @@ def main():
     top_assignees = df_2025['assignee'].value_counts().head(3).to_dict()
 
     # Top labels
-    all_labels = [l for sublist in df_2025['labels'].apply(eval) for l in sublist]
-    top_labels = Counter(all_labels).most_common(3)
+    top_labels = list(count_labels(df_2025['labels']).head(3).items())
 
     print(f"2025 Issues: {total_2025} (Open: {open_2025}, Closed: {closed_2025})")
     print(f"With no labels: {nolabel_2025} ({nolabel_pct}%)")
@@ -187,9 +273,7 @@ def main():
     created_per_month = df_2025.resample('M').size()
     fig, ax = plt.subplots()
     created_per_month.plot(ax=ax, title="2025 Issues Created per Month")
-    plt.savefig('2025_issues_created_per_month.png')
-    print("Saved: 2025_issues_created_per_month.png")
-    plt.close()
+    plot_and_save(fig, '2025_issues_created_per_month.png')
 
     # If you want, also plot closed per month
     if df_2025['closed_at'].notna().any():
@@ -198,9 +282,7 @@ def main():
         closed_per_month = df_closed.resample('M').size()
         fig2, ax2 = plt.subplots()
         closed_per_month.plot(ax=ax2, color="green", title="2025 Issues Closed per Month")
-        plt.savefig('2025_issues_closed_per_month.png')
-        print("Saved: 2025_issues_closed_per_month.png")
-        plt.close()
+        plot_and_save(fig2, '2025_issues_closed_per_month.png')
 
 if __name__ == "__main__":
     main()